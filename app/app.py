@@ -1,17 +1,174 @@
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, Response, abort, request, render_template
+from collections import defaultdict, deque
+from dataclasses import dataclass, replace
 from datetime import datetime
+from typing import Optional
+import orjson
 import os
+import threading
 
 app = Flask(__name__)
 
+
+# ============================================================================
+# DATA MODELS
+# ============================================================================
+# Slotted records use far less memory per entry than dicts; orjson
+# serializes dataclasses natively, with fields in declaration order.
+
+@dataclass
+class Order:
+    """A customer order"""
+    __slots__ = ("order_id", "customer", "items", "status", "created_at")
+    order_id: str
+    customer: str
+    items: list
+    status: str
+    created_at: str
+
+
+@dataclass
+class Shipment:
+    """A shipment and its tracking history"""
+    __slots__ = ("shipment_id", "origin", "destination", "status", "current_location",
+                 "created_at", "estimated_delivery", "tracking_history")
+    shipment_id: str
+    origin: str
+    destination: str
+    status: str
+    current_location: str
+    created_at: str
+    estimated_delivery: Optional[str]
+    tracking_history: deque
+
+
+@dataclass
+class InventoryItem:
+    """A stocked inventory item"""
+    __slots__ = ("item_id", "name", "quantity", "location", "category", "last_updated")
+    item_id: str
+    name: str
+    quantity: int
+    location: str
+    category: str
+    last_updated: str
+
+
+# Oldest tracking entries are dropped once a shipment has this many
+TRACKING_HISTORY_LIMIT = 200
+
 # In-memory storage (for demonstration - in production, use a database)
 shipments = {}
 inventory = {}
 orders = {}
 
+# Guard check-then-set writes and cache fills on each store
+shipments_lock = threading.Lock()
+inventory_lock = threading.Lock()
+orders_lock = threading.Lock()
+
+# Shipment ids grouped by status, kept in sync with `shipments`; the inner
+# dicts act as ordered sets so filtered listings keep insertion order
+shipments_by_status = defaultdict(dict)
+
+# Serialized JSON bodies for GET endpoints, refreshed or invalidated on writes
+order_json_cache = {}
+shipment_json_cache = {}
+inventory_json_cache = {}
+list_json_cache = {}
+
 # Configuration
 app.config['ENV'] = os.getenv('FLASK_ENV', 'production')
 app.config['DEBUG'] = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+app.config['MAX_CONTENT_LENGTH'] = 64 * 1024  # Reject oversized bodies before parsing
+
+# Bound once to skip the attribute lookup in every write handler
+_utcnow = datetime.utcnow
+
+
+def _json_default(obj):
+    """Serialize types orjson does not handle natively"""
+    if isinstance(obj, deque):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dump_json(data):
+    """Encode data as JSON bytes with orjson"""
+    return orjson.dumps(data, default=_json_default)
+
+
+def json_bytes_response(body, status=200):
+    """Build a JSON response from an already serialized body"""
+    return Response(body, status=status, mimetype='application/json')
+
+
+def unencodable_response():
+    """Reject request data that orjson cannot encode, e.g. nesting past its depth limit"""
+    return make_json_response({"error": "Request data could not be encoded as JSON"}, 400)
+
+
+def make_json_response(data, status=200):
+    """Build a JSON response encoded with orjson"""
+    return json_bytes_response(dump_json(data), status)
+
+
+def cached_json_response(cache, key, data, lock):
+    """Serve data from the given cache, serializing it on the first request"""
+    body = cache.get(key)
+    if body is None:
+        with lock:
+            body = cache[key] = dump_json(data)
+    return json_bytes_response(body)
+
+
+def stream_json_list(key, bodies):
+    """Yield a {"count": ..., key: [...]} JSON body from pre-serialized items"""
+    yield b'{"count":%d,"%s":[' % (len(bodies), key.encode())
+    for i, body in enumerate(bodies):
+        if i:
+            yield b','
+        yield body
+    yield b']}'
+
+
+def parse_json_body():
+    """Parse the request body with orjson, returning None if it is not valid JSON"""
+    if not request.is_json:
+        abort(415)
+    try:
+        return orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return None
+
+
+# Constant response bodies, serialized once at import time
+_API_INFO = dump_json({
+    "service": "Logistics Service",
+    "status": "Running",
+    "version": "2.0",
+    "features": [
+        "Shipment Tracking",
+        "Inventory Management",
+        "Route Optimization",
+        "Order Management"
+    ]
+})
+_HEALTH = b'{"status":"UP"}'
+
+# Fixed envelopes for write responses; the record's JSON is spliced in
+_CREATE_ORDER_TMPL = b'{"message":"Order created successfully","order":%s}'
+_CREATE_SHIPMENT_TMPL = b'{"message":"Shipment created successfully","shipment":%s}'
+_UPDATE_LOCATION_TMPL = b'{"message":"Location updated successfully","shipment":%s}'
+_ADD_ITEM_TMPL = b'{"message":"Inventory item added successfully","item":%s}'
+_UPDATE_STOCK_TMPL = b'{"message":"Stock updated successfully","item":%s}'
+_OPTIMIZE_ROUTE_TMPL = b'{"message":"Route optimized successfully","route":%s}'
+
+
+# Required fields for request payloads
+_SHIPMENT_REQUIRED = frozenset(("shipment_id", "origin", "destination"))
+_INVENTORY_REQUIRED = frozenset(("item_id", "name", "quantity"))
+_ROUTE_REQUIRED = frozenset(("start", "waypoints", "end"))
 
 
 @app.route("/", methods=["GET"])
@@ -23,23 +180,13 @@ def home():
 @app.route("/api", methods=["GET"])
 def api_info():
     """Service information endpoint (JSON)"""
-    return jsonify({
-        "service": "Logistics Service",
-        "status": "Running",
-        "version": "2.0",
-        "features": [
-            "Shipment Tracking",
-            "Inventory Management",
-            "Route Optimization",
-            "Order Management"
-        ]
-    })
+    return json_bytes_response(_API_INFO)
 
 
 @app.route("/health", methods=["GET"])
 def health():
     """Health check endpoint for container orchestration"""
-    return jsonify({"status": "UP"}), 200
+    return json_bytes_response(_HEALTH, 200)
 
 
 # ============================================================================
@@ -49,39 +196,44 @@ def health():
 @app.route("/order", methods=["POST"])
 def create_order():
     """Create a new order"""
-    data = request.get_json()
+    data = parse_json_body()
 
     if not data or "order_id" not in data:
-        return jsonify({"error": "Invalid order data - order_id is required"}), 400
+        return make_json_response({"error": "Invalid order data - order_id is required"}, 400)
 
     order_id = data["order_id"]
 
 
-    if order_id in orders:
-        return jsonify({"error": "Order already exists"}), 409
+    with orders_lock:
+        if order_id in orders:
+            return make_json_response({"error": "Order already exists"}, 409)
 
-    orders[order_id] = {
-        "order_id": order_id,
-        "customer": data.get("customer", "Unknown"),
-        "items": data.get("items", []),
-        "status": "created",
-        "created_at": datetime.utcnow().isoformat()
-    }
+        order = Order(
+            order_id=order_id,
+            customer=data.get("customer", "Unknown"),
+            items=data.get("items", []),
+            status="created",
+            created_at=_utcnow().isoformat()
+        )
+        try:
+            body = dump_json(order)
+        except orjson.JSONEncodeError:
+            return unencodable_response()
+
+        orders[order_id] = order
+        order_json_cache[order_id] = body
 
-    return jsonify({
-        "message": "Order created successfully",
-        "order": orders[order_id]
-    }), 201
+    return json_bytes_response(_CREATE_ORDER_TMPL % body, 201)
 
 
 @app.route("/order/<order_id>", methods=["GET"])
 def get_order(order_id):
     """Get order details by ID"""
     if order_id not in orders:
-        return jsonify({"error": "Order not found"}), 404
+        return make_json_response({"error": "Order not found"}, 404)
 
 
-    return jsonify(orders[order_id]), 200
+    return cached_json_response(order_json_cache, order_id, orders[order_id], orders_lock)
 
 
 # ============================================================================
@@ -91,81 +243,108 @@ def get_order(order_id):
 @app.route("/shipment", methods=["POST"])
 def create_shipment():
     """Create a new shipment"""
-    data = request.get_json()
+    data = parse_json_body()
 
-    required_fields = ["shipment_id", "origin", "destination"]
-    if not data or not all(field in data for field in required_fields):
-        return jsonify({
+    missing = _SHIPMENT_REQUIRED.difference(data) if data else _SHIPMENT_REQUIRED
+    if missing:
+        return make_json_response({
             "error": "Missing required fields",
-            "required": required_fields
-        }), 400
+            "required": sorted(_SHIPMENT_REQUIRED),
+            "missing": sorted(missing)
+        }, 400)
 
     shipment_id = data["shipment_id"]
 
 
-    if shipment_id in shipments:
-        return jsonify({"error": "Shipment already exists"}), 409
-
-    shipments[shipment_id] = {
-        "shipment_id": shipment_id,
-        "origin": data["origin"],
-        "destination": data["destination"],
-        "status": "pending",
-        "current_location": data["origin"],
-        "created_at": datetime.utcnow().isoformat(),
-        "estimated_delivery": data.get("estimated_delivery"),
-        "tracking_history": [
-            {
-                "location": data["origin"],
-                "status": "pending",
-                "timestamp": datetime.utcnow().isoformat()
-            }
-        ]
-    }
-
-    return jsonify({
-        "message": "Shipment created successfully",
-        "shipment": shipments[shipment_id]
-    }), 201
+    now = _utcnow().isoformat()
+    with shipments_lock:
+        if shipment_id in shipments:
+            return make_json_response({"error": "Shipment already exists"}, 409)
+
+        shipment = Shipment(
+            shipment_id=shipment_id,
+            origin=data["origin"],
+            destination=data["destination"],
+            status="pending",
+            current_location=data["origin"],
+            created_at=now,
+            estimated_delivery=data.get("estimated_delivery"),
+            tracking_history=deque([
+                {
+                    "location": data["origin"],
+                    "status": "pending",
+                    "timestamp": now
+                }
+            ], maxlen=TRACKING_HISTORY_LIMIT)
+        )
+        try:
+            body = dump_json(shipment)
+        except orjson.JSONEncodeError:
+            return unencodable_response()
+
+        shipments[shipment_id] = shipment
+        shipments_by_status["pending"][shipment_id] = None
+        shipment_json_cache[shipment_id] = body
+        list_json_cache.pop("shipments", None)
+
+    return json_bytes_response(_CREATE_SHIPMENT_TMPL % body, 201)
 
 
 @app.route("/shipment/<shipment_id>", methods=["GET"])
 def get_shipment(shipment_id):
     """Get shipment status and tracking information"""
     if shipment_id not in shipments:
-        return jsonify({"error": "Shipment not found"}), 404
+        return make_json_response({"error": "Shipment not found"}, 404)
 
 
-    return jsonify(shipments[shipment_id]), 200
+    return cached_json_response(shipment_json_cache, shipment_id, shipments[shipment_id], shipments_lock)
 
 
 @app.route("/shipment/<shipment_id>/location", methods=["PUT"])
 def update_shipment_location(shipment_id):
     """Update shipment location"""
     if shipment_id not in shipments:
-        return jsonify({"error": "Shipment not found"}), 404
+        return make_json_response({"error": "Shipment not found"}, 404)
 
-    data = request.get_json()
+    data = parse_json_body()
     if not data or "location" not in data:
-        return jsonify({"error": "Location is required"}), 400
-
-    shipment = shipments[shipment_id]
-    shipment["current_location"] = data["location"]
-    shipment["status"] = data.get("status", "in_transit")
-
-
-    # Add to tracking history
-    shipment["tracking_history"].append({
-        "location": data["location"],
-        "status": shipment["status"],
-        "timestamp": datetime.utcnow().isoformat(),
-        "notes": data.get("notes", "")
-    })
-
-    return jsonify({
-        "message": "Location updated successfully",
-        "shipment": shipment
-    }), 200
+        return make_json_response({"error": "Location is required"}, 400)
+
+    new_status = data.get("status", "in_transit")
+    if not isinstance(new_status, str):
+        return make_json_response({"error": "Status must be a string"}, 400)
+
+    with shipments_lock:
+        # Build and encode the updated record before touching the store
+        old = shipments[shipment_id]
+        shipment = replace(
+            old,
+            current_location=data["location"],
+            status=new_status,
+            tracking_history=deque(old.tracking_history, maxlen=TRACKING_HISTORY_LIMIT)
+        )
+
+
+        # Add to tracking history
+        shipment.tracking_history.append({
+            "location": data["location"],
+            "status": shipment.status,
+            "timestamp": _utcnow().isoformat(),
+            "notes": data.get("notes", "")
+        })
+        try:
+            body = dump_json(shipment)
+        except orjson.JSONEncodeError:
+            return unencodable_response()
+
+        if new_status != old.status:
+            shipments_by_status[old.status].pop(shipment_id, None)
+            shipments_by_status[new_status][shipment_id] = None
+        shipments[shipment_id] = shipment
+        shipment_json_cache[shipment_id] = body
+        list_json_cache.pop("shipments", None)
+
+    return json_bytes_response(_UPDATE_LOCATION_TMPL % body, 200)
 
 
 @app.route("/shipments", methods=["GET"])
@@ -174,15 +353,25 @@ def list_shipments():
     status_filter = request.args.get('status')
 
 
-    filtered_shipments = shipments.values()
-    if status_filter:
-        filtered_shipments = [s for s in shipments.values() if s['status'] == status_filter]
+    if not status_filter:
+        body = list_json_cache.get("shipments")
+        if body is None:
+            with shipments_lock:
+                body = list_json_cache["shipments"] = dump_json({
+                    "count": len(shipments),
+                    "shipments": list(shipments.values())
+                })
+        return json_bytes_response(body)
+
+    # Serialize under the lock so the stream is a consistent snapshot
+    with shipments_lock:
+        filtered_bodies = [
+            shipment_json_cache.get(i) or dump_json(shipments[i])
+            for i in shipments_by_status.get(status_filter, ())
+        ]
 
 
-    return jsonify({
-        "count": len(filtered_shipments),
-        "shipments": list(filtered_shipments)
-    }), 200
+    return Response(stream_json_list("shipments", filtered_bodies), mimetype='application/json')
 
 
 # ============================================================================
@@ -192,112 +381,135 @@ def list_shipments():
 @app.route("/inventory", methods=["GET"])
 def get_inventory():
     """Get all inventory items"""
-    return jsonify({
-        "count": len(inventory),
-        "inventory": list(inventory.values())
-    }), 200
+    body = list_json_cache.get("inventory")
+    if body is None:
+        with inventory_lock:
+            body = list_json_cache["inventory"] = dump_json({
+                "count": len(inventory),
+                "inventory": list(inventory.values())
+            })
+    return json_bytes_response(body)
 
 
 @app.route("/inventory", methods=["POST"])
 def add_inventory_item():
     """Add a new inventory item"""
-    data = request.get_json()
+    data = parse_json_body()
 
-    required_fields = ["item_id", "name", "quantity"]
-    if not data or not all(field in data for field in required_fields):
-        return jsonify({
+    missing = _INVENTORY_REQUIRED.difference(data) if data else _INVENTORY_REQUIRED
+    if missing:
+        return make_json_response({
             "error": "Missing required fields",
-            "required": required_fields
-        }), 400
+            "required": sorted(_INVENTORY_REQUIRED),
+            "missing": sorted(missing)
+        }, 400)
 
     item_id = data["item_id"]
 
 
-    if item_id in inventory:
-        return jsonify({"error": "Item already exists"}), 409
+    with inventory_lock:
+        if item_id in inventory:
+            return make_json_response({"error": "Item already exists"}, 409)
 
-    try:
-        quantity = int(data["quantity"])
-        if quantity < 0:
-            return jsonify({"error": "Quantity must be non-negative"}), 400
-    except (ValueError, TypeError):
-        return jsonify({"error": "Quantity must be a valid integer"}), 400
-
-    inventory[item_id] = {
-        "item_id": item_id,
-        "name": data["name"],
-        "quantity": quantity,
-        "location": data.get("location", "Warehouse"),
-        "category": data.get("category", "General"),
-        "last_updated": datetime.utcnow().isoformat()
-    }
+        try:
+            quantity = int(data["quantity"])
+            if quantity < 0:
+                return make_json_response({"error": "Quantity must be non-negative"}, 400)
+        except (ValueError, TypeError):
+            return make_json_response({"error": "Quantity must be a valid integer"}, 400)
+
+        item = InventoryItem(
+            item_id=item_id,
+            name=data["name"],
+            quantity=quantity,
+            location=data.get("location", "Warehouse"),
+            category=data.get("category", "General"),
+            last_updated=_utcnow().isoformat()
+        )
+        try:
+            body = dump_json(item)
+        except orjson.JSONEncodeError:
+            return unencodable_response()
 
-    return jsonify({
-        "message": "Inventory item added successfully",
-        "item": inventory[item_id]
-    }), 201
+        inventory[item_id] = item
+        inventory_json_cache[item_id] = body
+        list_json_cache.pop("inventory", None)
+
+    return json_bytes_response(_ADD_ITEM_TMPL % body, 201)
 
 
 @app.route("/inventory/<item_id>", methods=["GET"])
 def get_inventory_item(item_id):
     """Get specific inventory item"""
     if item_id not in inventory:
-        return jsonify({"error": "Item not found"}), 404
+        return make_json_response({"error": "Item not found"}, 404)
 
 
-    return jsonify(inventory[item_id]), 200
+    return cached_json_response(inventory_json_cache, item_id, inventory[item_id], inventory_lock)
 
 
 @app.route("/inventory/<item_id>/stock", methods=["PUT"])
 def update_stock(item_id):
     """Update inventory stock quantity"""
     if item_id not in inventory:
-        return jsonify({"error": "Item not found"}), 404
+        return make_json_response({"error": "Item not found"}, 404)
 
-    data = request.get_json()
+    data = parse_json_body()
     if not data or "quantity" not in data:
-        return jsonify({"error": "Quantity is required"}), 400
+        return make_json_response({"error": "Quantity is required"}, 400)
 
     try:
         quantity = int(data["quantity"])
         if quantity < 0:
-            return jsonify({"error": "Quantity must be non-negative"}), 400
+            return make_json_response({"error": "Quantity must be non-negative"}, 400)
     except (ValueError, TypeError):
-        return jsonify({"error": "Quantity must be a valid integer"}), 400
+        return make_json_response({"error": "Quantity must be a valid integer"}, 400)
+
+    with inventory_lock:
+        item = replace(inventory[item_id], quantity=quantity, last_updated=_utcnow().isoformat())
+        try:
+            body = dump_json(item)
+        except orjson.JSONEncodeError:
+            return unencodable_response()
 
-    inventory[item_id]["quantity"] = quantity
-    inventory[item_id]["last_updated"] = datetime.utcnow().isoformat()
+        inventory[item_id] = item
+        inventory_json_cache[item_id] = body
+        list_json_cache.pop("inventory", None)
 
-    return jsonify({
-        "message": "Stock updated successfully",
-        "item": inventory[item_id]
-    }), 200
+    return json_bytes_response(_UPDATE_STOCK_TMPL % body, 200)
 
 
 # ============================================================================
 # ROUTE OPTIMIZATION
 # ============================================================================
 
+def _compute_route_metrics(n_waypoints):
+    """Return (total_stops, estimated_time_minutes) for a route"""
+    # Calculate "distance" (simplified - just count of stops)
+    total_stops = n_waypoints + 1  # waypoints + end
+    estimated_time = total_stops * 30  # 30 minutes per stop (simplified)
+    return total_stops, estimated_time
+
+
 @app.route("/route/optimize", methods=["POST"])
 def optimize_route():
     """Calculate optimal route (simplified algorithm for demo)"""
-    data = request.get_json()
+    data = parse_json_body()
 
-    required_fields = ["start", "waypoints", "end"]
-    if not data or not all(field in data for field in required_fields):
-        return jsonify({
+    missing = _ROUTE_REQUIRED.difference(data) if data else _ROUTE_REQUIRED
+    if missing:
+        return make_json_response({
             "error": "Missing required fields",
-            "required": required_fields
-        }), 400
+            "required": sorted(_ROUTE_REQUIRED),
+            "missing": sorted(missing)
+        }, 400)
 
     # Simple demonstration algorithm (in production, use real routing API)
     waypoints = data["waypoints"]
     if not isinstance(waypoints, list):
-        return jsonify({"error": "Waypoints must be a list"}), 400
+        return make_json_response({"error": "Waypoints must be a list"}, 400)
 
-    # Calculate "distance" (simplified - just count of stops)
-    total_stops = len(waypoints) + 1  # waypoints + end
-    estimated_time = total_stops * 30  # 30 minutes per stop (simplified)
+    total_stops, estimated_time = _compute_route_metrics(len(waypoints))
 
     optimized_route = {
         "start": data["start"],
@@ -309,10 +521,12 @@ def optimize_route():
         "route_efficiency": "optimal"
     }
 
-    return jsonify({
-        "message": "Route optimized successfully",
-        "route": optimized_route
-    }), 200
+    try:
+        body = dump_json(optimized_route)
+    except orjson.JSONEncodeError:
+        return unencodable_response()
+
+    return json_bytes_response(_OPTIMIZE_ROUTE_TMPL % body, 200)
 
 
 # ============================================================================
@@ -322,13 +536,25 @@ def optimize_route():
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
-    return jsonify({"error": "Resource not found"}), 404
+    return make_json_response({"error": "Resource not found"}, 404)
+
+
+@app.errorhandler(413)
+def request_too_large(error):
+    """Handle 413 errors"""
+    return make_json_response({"error": "Request too large"}, 413)
+
+
+@app.errorhandler(415)
+def unsupported_media_type(error):
+    """Handle 415 errors"""
+    return make_json_response({"error": "Content-Type must be application/json"}, 415)
 
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
-    return jsonify({"error": "Internal server error"}), 500
+    return make_json_response({"error": "Internal server error"}, 500)
 
 
 if __name__ == "__main__":
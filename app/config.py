@@ -11,7 +11,7 @@ class Config:
 
     # Application settings
     JSON_SORT_KEYS = False
-    JSONIFY_PRETTYPRINT_REGULAR = True
+    JSONIFY_PRETTYPRINT_REGULAR = False
 
 
 class DevelopmentConfig(Config):
@@ -1,6 +1,9 @@
 import json
+import threading
+import time
 import pytest
-from app import app
+import app as app_module
+from app import app, stream_json_list, TRACKING_HISTORY_LIMIT
 
 
 @pytest.fixture
@@ -60,6 +63,18 @@ def test_home(client):
     assert len(data["features"]) > 0
 
 
+def test_api_info(client):
+    """Test service information endpoint"""
+    response = client.get("/api")
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert response.content_type == "application/json"
+    assert data["status"] == "Running"
+    assert data["version"] == "2.0"
+    assert len(data["features"]) > 0
+
+
 def test_health(client):
     """Test health check endpoint"""
     response = client.get("/health")
@@ -96,6 +111,28 @@ def test_create_order_missing_id(client):
     assert "error" in data
 
 
+def test_create_order_malformed_json(client):
+    """Test creating order with a body that is not valid JSON"""
+    response = client.post("/order",
+                          data="{not json",
+                          content_type='application/json')
+    data = json.loads(response.data)
+
+    assert response.status_code == 400
+    assert "error" in data
+
+
+def test_create_order_wrong_content_type(client):
+    """Test creating order with a non-JSON content type"""
+    response = client.post("/order",
+                          data=json.dumps({"order_id": "ORD-TEXT"}),
+                          content_type='text/plain')
+    data = json.loads(response.data)
+
+    assert response.status_code == 415
+    assert "error" in data
+
+
 def test_create_order_duplicate(client, sample_order):
     """Test creating duplicate order"""
     # Create first order
@@ -113,6 +150,37 @@ def test_create_order_duplicate(client, sample_order):
     assert "error" in data
 
 
+class SlowContainsDict(dict):
+    """Dict whose membership check yields, holding the check-then-set window open"""
+
+    def __contains__(self, key):
+        found = super().__contains__(key)
+        time.sleep(0.01)
+        return found
+
+
+def test_create_order_concurrent_duplicates(monkeypatch):
+    """Test that concurrent creates of one order id succeed exactly once"""
+    monkeypatch.setattr(app_module, "orders", SlowContainsDict())
+    statuses = []
+
+    def create():
+        with app.test_client() as thread_client:
+            response = thread_client.post("/order",
+                                          data=json.dumps({"order_id": "ORD-CONCURRENT"}),
+                                          content_type='application/json')
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=create) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses.count(201) == 1
+    assert statuses.count(409) == 7
+
+
 def test_get_order_success(client, sample_order):
     """Test retrieving an existing order"""
     # Create order first
@@ -152,6 +220,7 @@ def test_create_shipment_success(client, sample_shipment):
     assert data["message"] == "Shipment created successfully"
     assert data["shipment"]["shipment_id"] == sample_shipment["shipment_id"]
     assert data["shipment"]["status"] == "pending"
+    assert data["shipment"]["tracking_history"][0]["timestamp"] == data["shipment"]["created_at"]
 
 
 def test_create_shipment_missing_fields(client):
@@ -164,6 +233,7 @@ def test_create_shipment_missing_fields(client):
     assert response.status_code == 400
     assert "error" in data
     assert "required" in data
+    assert data["missing"] == ["destination", "origin"]
 
 
 def test_get_shipment_success(client, sample_shipment):
@@ -211,6 +281,79 @@ def test_update_shipment_location(client, sample_shipment):
     assert len(data["shipment"]["tracking_history"]) == 2
 
 
+def test_get_shipment_after_update(client, sample_shipment):
+    """Test that a cached shipment reflects later location updates"""
+    # Create and fetch shipment so its response is cached
+    client.post("/shipment",
+               data=json.dumps(sample_shipment),
+               content_type='application/json')
+    client.get(f"/shipment/{sample_shipment['shipment_id']}")
+
+    # Update location
+    client.put(f"/shipment/{sample_shipment['shipment_id']}/location",
+              data=json.dumps({"location": "Denver"}),
+              content_type='application/json')
+    response = client.get(f"/shipment/{sample_shipment['shipment_id']}")
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data["current_location"] == "Denver"
+
+
+def test_tracking_history_is_bounded(client):
+    """Test that tracking history keeps only the most recent entries"""
+    shipment = {"shipment_id": "SHP-020", "origin": "Seattle", "destination": "Portland"}
+    client.post("/shipment",
+               data=json.dumps(shipment),
+               content_type='application/json')
+
+    for i in range(TRACKING_HISTORY_LIMIT + 5):
+        client.put("/shipment/SHP-020/location",
+                  data=json.dumps({"location": f"Stop {i}"}),
+                  content_type='application/json')
+
+    response = client.get("/shipment/SHP-020")
+    data = json.loads(response.data)
+
+    assert len(data["tracking_history"]) == TRACKING_HISTORY_LIMIT
+    assert data["tracking_history"][-1]["location"] == f"Stop {TRACKING_HISTORY_LIMIT + 4}"
+
+
+def test_create_shipment_deeply_nested(client):
+    """Test that unencodable shipment data is rejected without breaking listings"""
+    shipment = {
+        "shipment_id": "SHP-NESTED",
+        "origin": json.loads("[" * 300 + "]" * 300),
+        "destination": "Denver"
+    }
+    response = client.post("/shipment",
+                          data=json.dumps(shipment),
+                          content_type='application/json')
+
+    assert response.status_code == 400
+    assert client.get("/shipment/SHP-NESTED").status_code == 404
+    assert client.get("/shipments").status_code == 200
+    assert client.get("/shipments?status=pending").status_code == 200
+
+
+def test_update_shipment_location_deeply_nested(client, sample_shipment):
+    """Test that an unencodable location update leaves the shipment unchanged"""
+    client.post("/shipment",
+               data=json.dumps(sample_shipment),
+               content_type='application/json')
+    before = json.loads(client.get(f"/shipment/{sample_shipment['shipment_id']}").data)
+
+    response = client.put(f"/shipment/{sample_shipment['shipment_id']}/location",
+                         data=json.dumps({"location": json.loads("[" * 300 + "]" * 300)}),
+                         content_type='application/json')
+
+    assert response.status_code == 400
+    after = client.get(f"/shipment/{sample_shipment['shipment_id']}")
+    assert after.status_code == 200
+    assert json.loads(after.data) == before
+    assert client.get("/shipments").status_code == 200
+
+
 def test_update_shipment_location_missing_data(client, sample_shipment):
     """Test updating shipment location without required data"""
     # Create shipment first
@@ -245,6 +388,64 @@ def test_list_shipments(client, sample_shipment):
     assert data["count"] >= 1
 
 
+def test_list_shipments_status_filter(client):
+    """Test listing shipments filtered by status"""
+    shipment = {"shipment_id": "SHP-010", "origin": "Boston", "destination": "Miami"}
+    client.post("/shipment",
+               data=json.dumps(shipment),
+               content_type='application/json')
+    client.put("/shipment/SHP-010/location",
+              data=json.dumps({"location": "Richmond", "status": "delayed"}),
+              content_type='application/json')
+
+    response = client.get("/shipments?status=delayed")
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert data["count"] == 1
+    assert data["shipments"][0]["shipment_id"] == "SHP-010"
+
+    pending_ids = [f"SHP-01{i}" for i in range(1, 9)]
+    for shipment_id in pending_ids:
+        client.post("/shipment",
+                   data=json.dumps({"shipment_id": shipment_id, "origin": "Boston", "destination": "Miami"}),
+                   content_type='application/json')
+
+    response = client.get("/shipments?status=pending")
+    data = json.loads(response.data)
+    listed_ids = [s["shipment_id"] for s in data["shipments"]]
+    assert "SHP-010" not in listed_ids
+    assert [i for i in listed_ids if i in pending_ids] == pending_ids
+
+
+def test_stream_json_list():
+    """Test streaming a list of pre-serialized items"""
+    body = b"".join(stream_json_list("shipments", [b'{"a":1}', b'{"b":2}']))
+
+    assert json.loads(body) == {"count": 2, "shipments": [{"a": 1}, {"b": 2}]}
+    assert json.loads(b"".join(stream_json_list("shipments", []))) == {"count": 0, "shipments": []}
+
+
+def test_update_shipment_location_invalid_status(client):
+    """Test updating shipment location with a non-string status"""
+    shipment = {"shipment_id": "SHP-030", "origin": "Austin", "destination": "Dallas"}
+    client.post("/shipment",
+               data=json.dumps(shipment),
+               content_type='application/json')
+
+    response = client.put("/shipment/SHP-030/location",
+                         data=json.dumps({"location": "Waco", "status": ["a"]}),
+                         content_type='application/json')
+    data = json.loads(response.data)
+
+    assert response.status_code == 400
+    assert "error" in data
+
+    response = client.get("/shipments?status=pending")
+    data = json.loads(response.data)
+    assert "SHP-030" in [s["shipment_id"] for s in data["shipments"]]
+
+
 # ============================================================================
 # INVENTORY MANAGEMENT TESTS
 # ============================================================================
@@ -315,6 +516,18 @@ def test_add_inventory_item_invalid_quantity(client):
     assert "error" in data
 
 
+def test_add_inventory_item_quantity_too_large(client):
+    """Test that a quantity too large to encode is rejected without breaking listings"""
+    item = {"item_id": "ITM-HUGE", "name": "Huge", "quantity": 2 ** 70}
+    response = client.post("/inventory",
+                          data=json.dumps(item),
+                          content_type='application/json')
+
+    assert response.status_code == 400
+    assert client.get("/inventory/ITM-HUGE").status_code == 404
+    assert client.get("/inventory").status_code == 200
+
+
 def test_get_inventory_item_success(client, sample_inventory):
     """Test getting specific inventory item"""
     # Add item first
@@ -423,6 +636,22 @@ def test_optimize_route_invalid_waypoints(client):
     assert "error" in data
 
 
+def test_optimize_route_deeply_nested(client):
+    """Test route optimization with data too deeply nested to encode"""
+    route_data = {
+        "start": "New York",
+        "waypoints": [json.loads("[" * 300 + "]" * 300)],
+        "end": "Atlanta"
+    }
+    response = client.post("/route/optimize",
+                          data=json.dumps(route_data),
+                          content_type='application/json')
+    data = json.loads(response.data)
+
+    assert response.status_code == 400
+    assert "error" in data
+
+
 # ============================================================================
 # ERROR HANDLER TESTS
 # ============================================================================
@@ -433,4 +662,15 @@ def test_404_error(client):
     data = json.loads(response.data)
 
     assert response.status_code == 404
+    assert "error" in data
+
+
+def test_request_too_large(client):
+    """Test that oversized request bodies are rejected"""
+    response = client.post("/order",
+                          data=json.dumps({"order_id": "ORD-BIG", "customer": "x" * (64 * 1024)}),
+                          content_type='application/json')
+    data = json.loads(response.data)
+
+    assert response.status_code == 413
     assert "error" in data
\ No newline at end of file